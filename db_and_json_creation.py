@@ -2,13 +2,52 @@ import sqlite3
 import random
 from datetime import datetime, timedelta
 import os
-import json
+
+from json_compat import dumps_json
+
+# Shared read-only connection used by load_data_from_db
+readonly_conn = None
+
+# Column order shared by the DB rows and the JSON records
+ACTIVITY_COLUMNS = ('username', 'log_date', 'software', 'start_file', 'end_file', 'start_time',
+                    'active_time', 'idle_time', 'total_time', 'end_time')
+
+
+def format_datetime(dt):
+    """Format dt as YYYY-MM-DD HH:MM:SS without going through strftime"""
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+            f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}")
+
+
+def readonly_connection():
+    """Return the shared read-only connection, opening it on first use"""
+    global readonly_conn
+    if readonly_conn is None:
+        readonly_conn = sqlite3.connect('file:activity_monitor.db?mode=ro', uri=True)
+        # Memory-map the file so page reads skip read() syscalls
+        readonly_conn.executescript('''
+        PRAGMA mmap_size=268435456;
+        PRAGMA query_only=1;
+        ''')
+    return readonly_conn
+
+
+def close_readonly_connection():
+    global readonly_conn
+    if readonly_conn is not None:
+        readonly_conn.close()
+        readonly_conn = None
 
 
 def create_activity_database():
-    # Remove existing database if it exists
-    if os.path.exists('activity_monitor.db'):
-        os.remove('activity_monitor.db')
+    # Drop the cached reader before its database file is replaced
+    close_readonly_connection()
+
+    # Remove existing database if it exists, along with any WAL files the
+    # UI's connection left behind so they are never replayed into the new one
+    for db_file in ('activity_monitor.db', 'activity_monitor.db-wal', 'activity_monitor.db-shm'):
+        if os.path.exists(db_file):
+            os.remove(db_file)
 
     # Create directory for JSON files if it doesn't exist
     json_dir = 'user_activity_logs'
@@ -21,6 +60,17 @@ def create_activity_database():
 
     # Connect to database
     conn = sqlite3.connect('activity_monitor.db')
+
+    # The sample database is a disposable fixture, so skip durability work
+    # while seeding it
+    conn.executescript('''
+    PRAGMA page_size=65536;
+    PRAGMA journal_mode=MEMORY;
+    PRAGMA synchronous=OFF;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA locking_mode=EXCLUSIVE;
+    PRAGMA cache_size=-100000;
+    ''')
     cursor = conn.cursor()
 
     # Create table
@@ -80,106 +130,121 @@ def create_activity_database():
     }
 
     # Generate activity data for each user
-    all_records = []
+    db_rows = []
 
     # Generate records for the past 30 days
     today = datetime.now()
-
-    for day_offset in range(30, 0, -1):
-        current_date = today - timedelta(days=day_offset)
-        date_str = current_date.strftime('%Y-%m-%d')
-
-        # Each user has 3-7 activity records per day
-        for username in usernames:
-            num_activities = random.randint(3, 7)
-            user_daily_records = []
-
-            for _ in range(num_activities):
-                # Select random software
-                software = random.choice(software_list)
-
-                # Generate random file identifiers
-                file_id = random.randint(1000, 9999)
-
-                # Get start and end file names
-                start_pattern = random.choice(file_patterns[software]['start'])
-                end_pattern = random.choice(file_patterns[software]['end'])
-
-                start_file = start_pattern.format(file_id)
-                end_file = end_pattern.format(file_id)
-
-                # Generate random start time for the day
-                hour = random.randint(8, 17)
-                minute = random.randint(0, 59)
-                second = random.randint(0, 59)
-
-                start_time = datetime.strptime(f"{date_str} {hour}:{minute}:{second}", "%Y-%m-%d %H:%M:%S")
-
-                # Generate random active and idle times
-                active_time = random.randint(300, 7200)  # 5 minutes to 2 hours
-                idle_time = random.randint(0, 900)  # 0 to 15 minutes
-                total_time = active_time + idle_time
-
-                # Calculate end time
-                end_time = start_time + timedelta(seconds=total_time)
-
-                # Create record
-                record = {
-                    'username': username,
-                    'log_date': date_str,
-                    'software': software,
-                    'start_file': start_file,
-                    'end_file': end_file,
-                    'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'active_time': active_time,
-                    'idle_time': idle_time,
-                    'total_time': total_time,
-                    'end_time': end_time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-
-                user_daily_records.append(record)
-                all_records.append(record)
-
-                # Insert record into database
-                cursor.execute('''
-                INSERT INTO activity_logs 
-                (username, log_date, software, start_file, end_file, start_time, active_time, idle_time, total_time, end_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    username,
-                    date_str,
-                    software,
-                    start_file,
-                    end_file,
-                    start_time.strftime('%Y-%m-%d %H:%M:%S'),
-                    active_time,
-                    idle_time,
-                    total_time,
-                    end_time.strftime('%Y-%m-%d %H:%M:%S')
-                ))
-
-            # Create JSON file for this user's daily activity
-            if user_daily_records:
+    day_offsets = range(30, 0, -1)
+
+    # Each user has 3-7 activity records per day
+    activity_counts = [random.randint(3, 7) for _ in range(len(day_offsets) * len(usernames))]
+    num_records = sum(activity_counts)
+
+    # Pre-sample all per-record randomness in bulk
+    softwares = random.choices(software_list, k=num_records)
+    file_ids = random.choices(range(1000, 10000), k=num_records)
+    hours = random.choices(range(8, 18), k=num_records)
+    minutes = random.choices(range(60), k=num_records)
+    seconds = random.choices(range(60), k=num_records)
+    active_times = random.choices(range(300, 7201), k=num_records)  # 5 minutes to 2 hours
+    idle_times = random.choices(range(901), k=num_records)  # 0 to 15 minutes
+
+    counts = iter(activity_counts)
+    next_idx = 0
+
+    # Records are streamed into all_activities.json as they are generated
+    with open(f"{json_dir}/all_activities.json", 'wb') as all_file:
+        for day_offset in day_offsets:
+            current_date = today - timedelta(days=day_offset)
+            year, month, day = current_date.year, current_date.month, current_date.day
+            date_str = f"{year:04d}-{month:02d}-{day:02d}"
+
+            for username in usernames:
+                num_activities = next(counts)
+                user_daily_records = []
+
+                for idx in range(next_idx, next_idx + num_activities):
+                    software = softwares[idx]
+                    file_id = file_ids[idx]
+
+                    # Get start and end file names
+                    patterns = file_patterns[software]
+                    start_pattern = random.choice(patterns['start'])
+                    end_pattern = random.choice(patterns['end'])
+
+                    start_file = start_pattern.format(file_id)
+                    end_file = end_pattern.format(file_id)
+
+                    start_time = datetime(year, month, day, hours[idx], minutes[idx], seconds[idx])
+
+                    active_time = active_times[idx]
+                    idle_time = idle_times[idx]
+                    total_time = active_time + idle_time
+
+                    # Calculate end time
+                    end_time = start_time + timedelta(seconds=total_time)
+
+                    # Format both timestamps once for the JSON record and the DB row
+                    start_time_str = format_datetime(start_time)
+                    end_time_str = format_datetime(end_time)
+
+                    # Queue row for the bulk database insert
+                    row = (
+                        username,
+                        date_str,
+                        software,
+                        start_file,
+                        end_file,
+                        start_time_str,
+                        active_time,
+                        idle_time,
+                        total_time,
+                        end_time_str
+                    )
+                    db_rows.append(row)
+
+                    # The JSON record is built from the same row
+                    record = dict(zip(ACTIVITY_COLUMNS, row))
+                    user_daily_records.append(record)
+
+                    # Stream the record into the combined file, one per line
+                    all_file.write(b'[\n' if idx == 0 else b',\n')
+                    all_file.write(dumps_json(record))
+
+                next_idx += num_activities
+
+                # Each user/day group is complete here, so write its file in one go
                 json_filename = f"{json_dir}/{username}_{date_str}.json"
-                with open(json_filename, 'w') as json_file:
-                    json.dump(user_daily_records, json_file, indent=4)
+                with open(json_filename, 'wb') as json_file:
+                    json_file.write(dumps_json(user_daily_records, indent=True))
+
+        all_file.write(b'\n]\n' if num_records else b'[]\n')
 
-    # Create a JSON file with all activities
-    with open(f"{json_dir}/all_activities.json", 'w') as json_file:
-        json.dump(all_records, json_file, indent=4)
+    # Insert all records in a single transaction
+    conn.execute("BEGIN")
+    cursor.executemany('''
+    INSERT INTO activity_logs 
+    (username, log_date, software, start_file, end_file, start_time, active_time, idle_time, total_time, end_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', db_rows)
+
+    # Index the newest-first ordering used by load_data_from_db and the UI;
+    # building it after the bulk insert is cheaper than maintaining it per row
+    cursor.execute('''
+    CREATE INDEX idx_logs_date_start ON activity_logs (log_date, start_time)
+    ''')
 
     # Commit changes and close connection
     conn.commit()
     conn.close()
 
-    print(f"Database created successfully with {len(all_records)} sample records.")
+    print(f"Database created successfully with {num_records} sample records.")
     print(f"JSON files created in the '{json_dir}' directory.")
 
 
 def load_data_from_db():
     """Function to demonstrate how to load data from the database for the UI"""
-    conn = sqlite3.connect('activity_monitor.db')
-    cursor = conn.cursor()
+    cursor = readonly_connection().cursor()
 
     # Example query that could be used with the UI filters
     cursor.execute('''
@@ -206,8 +271,6 @@ def load_data_from_db():
         print(f"Activity: {active_time_min} min active, {idle_time_min} min idle, {total_time_min} min total")
         print("-" * 50)
 
-    conn.close()
-
 
 if __name__ == "__main__":
     create_activity_database()
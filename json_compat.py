@@ -0,0 +1,28 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_json(obj, indent=False):
+    """Serialize obj to JSON bytes, using orjson when it is installed"""
+    # orjson only supports a two-space indent, so the stdlib path matches it
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def loads_json(raw):
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def pretty_json(raw):
+    """Re-indent JSON bytes for display"""
+    return dumps_json(loads_json(raw), indent=True).decode()
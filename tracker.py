@@ -1,22 +1,27 @@
 import os
 import time
-import datetime
 import getpass
 import json
+import math
 from pathlib import Path
 import atexit
-from pynput import mouse, keyboard
+import signal
+import sys
 import tempfile
 import threading
+import queue
+
+from json_compat import dumps_json, loads_json
 
 # Get user and software info
 USERNAME = getpass.getuser()
 SOFTWARE_NAME = "Maya_2024"
-TODAY = datetime.datetime.now().strftime("%Y-%m-%d")
+TODAY = time.strftime("%Y-%m-%d")
 
 # Temp directory for JSON storage
-temp_dir = "C:/temp"
-json_path = os.path.join(temp_dir, f"software_{TODAY}.json")
+TEMP_DIR = Path("C:/temp")
+TEMP_DIR.mkdir(parents=True, exist_ok=True)
+json_path = TEMP_DIR / f"software_{TODAY}.json"
 
 
 def format_time_hms(seconds):
@@ -28,21 +33,38 @@ def format_time_hms(seconds):
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
-def load_json():
-    if os.path.exists(json_path):
-        try:
-            with open(json_path, "r") as f:
-                data = json.load(f)
-                # Convert stored times to formatted strings if they're numbers
-                for key in ['active_time', 'idle_time', 'total_time']:
-                    if key in data and isinstance(data[key], (int, float)):
-                        data[key] = format_time_hms(int(data[key]))
-                return data
-        except json.JSONDecodeError:
-            # Handle corrupted JSON file
-            pass
+def parse_time_hms(value):
+    """Convert an hours:minutes:seconds string back to seconds"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    hours, minutes, secs = value.split(":", 2)
+    return int(hours) * 3600 + int(minutes) * 60 + int(secs)
 
-    current_time = datetime.datetime.now().strftime('%H:%M:%S')
+
+def next_midnight():
+    """Return the wall-clock timestamp of the next local midnight"""
+    now = time.localtime()
+    return time.mktime((now.tm_year, now.tm_mon, now.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+
+
+def load_json():
+    # Open directly rather than stat-ing first; a missing file is the common
+    # case at the start of each day
+    try:
+        with open(json_path, "rb") as f:
+            data = loads_json(f.read())
+            # Convert stored times to formatted strings if they're numbers
+            for key in ['active_time', 'idle_time', 'total_time']:
+                if key in data and isinstance(data[key], (int, float)):
+                    data[key] = format_time_hms(int(data[key]))
+            return data
+    except FileNotFoundError:
+        pass
+    except json.JSONDecodeError:
+        # Handle corrupted JSON file
+        pass
+
+    current_time = time.strftime('%H:%M:%S')
     return {
         "username": USERNAME,
         "software": SOFTWARE_NAME,
@@ -50,142 +72,358 @@ def load_json():
         "start_time": current_time,
         "active_time": "00:00:00",
         "idle_time": "00:00:00",
-        "total_time": "00:00:00",
-        "_raw_active_seconds": 0,
-        "_raw_idle_seconds": 0,
-        "_raw_total_seconds": 0
+        "total_time": "00:00:00"
     }
 
 
-def save_json():
-    # Create a copy of the data for saving
-    save_data = usage_data.copy()
+# Fields written to the JSON file; the raw counters only live in memory
+PERSISTED_KEYS = ("username", "software", "date", "start_time",
+                  "active_time", "idle_time", "total_time", "end_time")
 
-    # Store the raw seconds values for internal use
-    save_data["_raw_active_seconds"] = raw_active_seconds
-    save_data["_raw_idle_seconds"] = raw_idle_seconds
-    save_data["_raw_total_seconds"] = raw_total_seconds
 
-    with open(json_path, "w") as f:
-        json.dump(save_data, f, indent=2)
+def snapshot_usage():
+    # The tracking loop only updates the raw counters, so the readable
+    # time strings are materialized here
+    usage_data = state.usage_data
+    usage_data["active_time"] = format_time_hms(state.raw_active_seconds)
+    usage_data["idle_time"] = format_time_hms(state.raw_idle_seconds)
+    usage_data["total_time"] = format_time_hms(state.raw_total_seconds)
 
+    # Build the payload from the persisted fields only
+    return {key: usage_data[key] for key in PERSISTED_KEYS if key in usage_data}
 
-# Load existing data or create new entry
-usage_data = load_json()
-start_time = time.time()
 
-# Initialize raw seconds counters
-raw_active_seconds = usage_data.get("_raw_active_seconds", 0)
-raw_idle_seconds = usage_data.get("_raw_idle_seconds", 0)
-raw_total_seconds = usage_data.get("_raw_total_seconds", 0)
+def write_json(path, save_data, pretty=False, durable=False):
+    # Periodic saves stay compact; only the final save is pretty-printed
+    data = dumps_json(save_data, indent=pretty)
+
+    # Write the payload into a temp file that then atomically replaces the
+    # target so a crash mid-write never leaves a truncated file behind.
+    # mkstemp gives each write its own file next to the target, so the
+    # rename never crosses filesystems and two writers never share a temp file.
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        # A buffered file writes the whole payload, retrying short writes
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            # Only boundary saves pay for flushing to disk
+            if durable:
+                os.fsync(f.fileno())
+        # mkstemp creates owner-only files; keep the report readable as before
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Don't leave orphaned temp files behind when the save fails
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Periodic saves are handed to a writer thread so disk I/O never blocks
+# the tracking loop. The queue only ever holds the newest snapshot.
+write_queue = queue.Queue(maxsize=1)
+save_lock = threading.Lock()
+finalized_path = None
+
+
+def queue_save():
+    """Queue a snapshot of the current usage for the writer thread"""
+    with state_lock:
+        item = (json_path, snapshot_usage())
+    try:
+        write_queue.put_nowait(item)
+    except queue.Full:
+        # Replace the stale snapshot that has not been written yet
+        try:
+            write_queue.get_nowait()
+        except queue.Empty:
+            pass
+        write_queue.put_nowait(item)
+
+
+def json_writer():
+    while True:
+        path, save_data = write_queue.get()
+        with save_lock:
+            # Never overwrite a file that already received its final save
+            if path != finalized_path:
+                try:
+                    write_json(path, save_data)
+                except OSError as e:
+                    # Keep the writer alive; the next snapshot retries the save
+                    print(f"Error saving usage data to {path}: {e}")
+
+
+def stored_seconds(usage_data, name):
+    """Return a saved counter, preferring the raw value that older files stored"""
+    raw = usage_data.get(f"_raw_{name}_seconds")
+    if isinstance(raw, (int, float)):
+        return raw
+    try:
+        return parse_time_hms(usage_data.get(f"{name}_time", "00:00:00"))
+    except (ValueError, TypeError, AttributeError):
+        # A hand-edited or partly written file restarts this counter from zero
+        return 0
+
+
+class UsageState:
+    """Mutable tracking state, held on one object instead of module globals"""
+
+    __slots__ = ("usage_data", "start_time", "raw_active_seconds", "raw_idle_seconds",
+                 "raw_total_seconds", "last_activity", "user_active")
+
+    def __init__(self, usage_data):
+        self.start_day(usage_data)
+        self.last_activity = time.monotonic()
+        # Raised by the input callbacks and cleared by the tracking loop,
+        # which turns it into last_activity on its next check
+        self.user_active = False
+
+    def start_day(self, usage_data):
+        """Start counting from the given day's loaded data"""
+        self.usage_data = usage_data
+        self.start_time = time.monotonic()
+        self.raw_active_seconds = stored_seconds(usage_data, "active")
+        self.raw_idle_seconds = stored_seconds(usage_data, "idle")
+        self.raw_total_seconds = stored_seconds(usage_data, "total")
+
+
+# Load existing data or create new entry
+state = UsageState(load_json())
 
-last_activity = time.time()
 IDLE_THRESHOLD = 300  # 5 minutes in seconds
+CHECK_INTERVAL = 1  # seconds between checks while the user is active
+MAX_IDLE_WAIT = 60  # longest wait between checks while the user is idle
+
+
+def save_interval(default=60):
+    """Read the periodic save interval, falling back when the override is malformed"""
+    value = os.environ.get("TRACKER_FLUSH_SEC")
+    if value is None:
+        return default
+    try:
+        interval = float(value)
+    except ValueError:
+        interval = None
+    # nan would never trigger a save, and zero or less would save every check
+    if interval is None or not math.isfinite(interval) or interval <= 0:
+        print(f"Ignoring invalid TRACKER_FLUSH_SEC={value!r}; saving every {default} seconds")
+        return default
+    return interval
+
+
+# Seconds between periodic saves; final_save still runs on exit
+SAVE_INTERVAL = save_interval()
+
+# Set by the input callbacks so an idle tracking loop wakes up on activity
+activity_event = threading.Event()
+# Set on exit so the tracking loop stops without finishing its wait
+stop_event = threading.Event()
+# Guards the counters and usage_data on state, which the tracking loop
+# updates and final_save reads from whichever thread runs it. The input
+# callbacks stay lock-free; user_active has a single writer per transition.
+state_lock = threading.Lock()
+
+
+def record_activity():
+    """Flag user input; only the first event after each check wakes the loop"""
+    if not state.user_active:
+        state.user_active = True
+        activity_event.set()
 
 
 # Define callback functions
 def on_move(x, y):
-    global last_activity
-    last_activity = time.time()
+    # Motion arrives per pixel; once this check is flagged the rest are redundant
+    if state.user_active:
+        return
+    record_activity()
 
 
 def on_click(x, y, button, pressed):
-    global last_activity
-    last_activity = time.time()
+    record_activity()
 
 
 def on_scroll(x, y, dx, dy):
-    global last_activity
-    last_activity = time.time()
+    # Scroll wheels also fire in bursts; skip events once already flagged
+    if state.user_active:
+        return
+    record_activity()
 
 
 def on_press(key):
-    global last_activity
-    last_activity = time.time()
+    record_activity()
 
 
 # Final save function for when program exits
 def final_save():
-    global raw_total_seconds, raw_active_seconds, raw_idle_seconds
+    global finalized_path
 
-    current_time = time.time()
-    raw_total_seconds = int(current_time - start_time)
+    with state_lock:
+        current_time = time.monotonic()
+        state.raw_total_seconds = int(current_time - state.start_time)
 
-    usage_data["total_time"] = format_time_hms(raw_total_seconds)
-    usage_data["active_time"] = format_time_hms(raw_active_seconds)
-    usage_data["idle_time"] = format_time_hms(raw_idle_seconds)
-    usage_data["end_time"] = datetime.datetime.now().strftime('%H:%M:%S')
+        usage_data = state.usage_data
+        usage_data["end_time"] = time.strftime('%H:%M:%S')
+        # Also refreshes the readable times printed below
+        save_data = snapshot_usage()
 
-    save_json()
+    with save_lock:
+        write_json(json_path, save_data, pretty=True, durable=True)
+        finalized_path = json_path
     print(f"Usage data saved to {json_path}")
     print(f"Total time: {usage_data['total_time']}")
     print(f"Active time: {usage_data['active_time']}")
     print(f"Idle time: {usage_data['idle_time']}")
 
 
-# Register the final save function for program exit
+# Bound at startup below; they stay None when headless or if startup fails
+# before reaching them, so the exit handlers can run at any point
+mouse_listener = keyboard_listener = None
+tracking_thread = None
+
+
+def stop_tracking():
+    """Stop the tracking loop and wait for it so the final save sees settled counters"""
+    stop_event.set()
+    activity_event.set()
+    # pynput's stop() is idempotent
+    for listener in (mouse_listener, keyboard_listener):
+        if listener is not None:
+            listener.stop()
+    if tracking_thread is not None and tracking_thread.is_alive():
+        tracking_thread.join(timeout=5)
+
+
+# Register the final save function for program exit; atexit runs handlers
+# in reverse order, so the tracking loop is stopped before the final save
 atexit.register(final_save)
+atexit.register(stop_tracking)
+
+
+def handle_sigterm(signum, frame):
+    # Exit normally so the atexit handlers stop tracking and save
+    sys.exit(0)
+
+
+# Leave a host application's own SIGTERM handling in place
+if signal.getsignal(signal.SIGTERM) in (signal.SIG_DFL, None):
+    try:
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    except ValueError:
+        # Signal handlers can only be installed from the main thread
+        pass
 
 
 # Main tracking function that runs in a separate thread
 def track_usage():
-    global usage_data, TODAY, json_path, start_time
-    global raw_active_seconds, raw_idle_seconds, raw_total_seconds
+    global TODAY, json_path
 
-    try:
-        last_check_time = time.time()
+    # Bound locally so the per-check updates are plain attribute stores
+    tracker_state = state
 
-        while True:
-            current_time = time.time()
+    try:
+        last_check_time = time.monotonic()
+        # Back-date the last save so the file is written on the first check
+        last_save_time = last_check_time - SAVE_INTERVAL
+        is_idle = False
+        idle_wait = CHECK_INTERVAL
+        # TODAY only has to be recomputed once the wall clock passes midnight
+        day_end = next_midnight()
+
+        while not stop_event.is_set():
+            current_time = time.monotonic()
             time_since_last_check = current_time - last_check_time
-            elapsed_since_activity = current_time - last_activity
 
-            if elapsed_since_activity > IDLE_THRESHOLD:
-                raw_idle_seconds += time_since_last_check
-            else:
-                raw_active_seconds += time_since_last_check
-
-            raw_total_seconds = int(current_time - start_time)
+            # Credit the interval to the state it started in; an idle wait
+            # ends as soon as input arrives, so all of it was idle time
+            with state_lock:
+                if is_idle:
+                    tracker_state.raw_idle_seconds += time_since_last_check
+                else:
+                    tracker_state.raw_active_seconds += time_since_last_check
 
-            # Update the formatted time strings
-            usage_data["active_time"] = format_time_hms(int(raw_active_seconds))
-            usage_data["idle_time"] = format_time_hms(int(raw_idle_seconds))
-            usage_data["total_time"] = format_time_hms(raw_total_seconds)
+                tracker_state.raw_total_seconds = int(current_time - tracker_state.start_time)
 
-            save_json()
             last_check_time = current_time
 
             # Check if date has changed
-            current_date = datetime.datetime.now().strftime("%Y-%m-%d")
+            current_date = TODAY
+            if time.time() >= day_end:
+                current_date = time.strftime("%Y-%m-%d")
+                day_end = next_midnight()
             if current_date != TODAY:
-                # Save final data for the day
+                # Save final data for the day; this is the only save this check
                 final_save()
 
                 # Update date and create new file for the new day
-                TODAY = current_date
-                json_path = temp_dir / f"software_usage_{TODAY}.json"
-                usage_data = load_json()
-                start_time = time.time()
-                raw_active_seconds = 0
-                raw_idle_seconds = 0
-                raw_total_seconds = 0
-
-            time.sleep(1)
+                with state_lock:
+                    TODAY = current_date
+                    json_path = TEMP_DIR / f"software_{TODAY}.json"
+                    tracker_state.start_day(load_json())
+
+                # Write the new day's file on the next check
+                last_save_time = current_time - SAVE_INTERVAL
+            elif current_time - last_save_time >= SAVE_INTERVAL:
+                # Counters only live in memory between periodic saves
+                queue_save()
+                last_save_time = current_time
+
+            # Clear before checking so input arriving from here on wakes the wait
+            activity_event.clear()
+            if tracker_state.user_active:
+                tracker_state.user_active = False
+                tracker_state.last_activity = current_time
+            is_idle = current_time - tracker_state.last_activity > IDLE_THRESHOLD
+
+            if is_idle:
+                # Sleep until input arrives, backing off while the user stays idle
+                activity_event.wait(idle_wait)
+                idle_wait = min(idle_wait * 2, MAX_IDLE_WAIT)
+            else:
+                idle_wait = CHECK_INTERVAL
+                stop_event.wait(CHECK_INTERVAL)
 
     except Exception as e:
         print(f"Error in usage tracking: {e}")
         final_save()
 
 
+def has_display():
+    """Return False when running headless, where there is no input to listen to"""
+    if sys.platform.startswith("linux"):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+
+def start_input_listeners():
+    """Start the pynput listeners, or return None for both when headless"""
+    if not has_display():
+        print("No display found; input listeners are disabled")
+        return None, None
+
+    # Imported here because pynput fails to import without a display
+    from pynput import mouse, keyboard
+
+    mouse_listener = mouse.Listener(on_move=on_move, on_click=on_click, on_scroll=on_scroll)
+    keyboard_listener = keyboard.Listener(on_press=on_press)
+    mouse_listener.start()
+    keyboard_listener.start()
+    return mouse_listener, keyboard_listener
+
+
 # Start listeners correctly with callbacks
-mouse_listener = mouse.Listener(on_move=on_move, on_click=on_click, on_scroll=on_scroll)
-keyboard_listener = keyboard.Listener(on_press=on_press)
-mouse_listener.start()
-keyboard_listener.start()
+mouse_listener, keyboard_listener = start_input_listeners()
 
-# Start tracking in a background thread
+# Start the JSON writer and tracking in background threads
+writer_thread = threading.Thread(target=json_writer, daemon=True)
+writer_thread.start()
 tracking_thread = threading.Thread(target=track_usage, daemon=True)
 tracking_thread.start()
 
 print(f"Usage tracking started for {SOFTWARE_NAME}. Data will be saved to {json_path}")
-print(f"Current active time: {usage_data['active_time']}")
\ No newline at end of file
+print(f"Current active time: {state.usage_data['active_time']}")
\ No newline at end of file
@@ -4,9 +4,305 @@ import sys
 from datetime import datetime, timedelta
 import os
 import json
+import math
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from json_compat import pretty_json
+
+# Worker processes only pay off once there are enough files to spread
+# their start-up cost over. They are spawned rather than forked, since
+# forking a multithreaded Qt process is unsafe, and each spawned child
+# re-imports this module and with it PySide2 before parsing anything.
+PARALLEL_JSON_MIN_FILES = 32
+# Upper bound on JSON worker processes, so each load pays for at most
+# this many child imports
+MAX_JSON_WORKERS = 4
+
+# JSON files larger than this are shown as stored rather than re-indented
+RAW_JSON_DISPLAY_BYTES = 1024 * 1024
+
+# Indexes the filter and sort queries rely on; created by the UI if the
+# database predates them
+ACTIVITY_INDEXES = {
+    'idx_logs_date_start': 'CREATE INDEX IF NOT EXISTS idx_logs_date_start ON activity_logs (log_date, start_time)',
+    'idx_logs_date_user_sw': 'CREATE INDEX IF NOT EXISTS idx_logs_date_user_sw '
+                             'ON activity_logs (log_date, username, software)',
+    # Let the completers' DISTINCT queries read the small indexes instead of the table
+    'idx_logs_username': 'CREATE INDEX IF NOT EXISTS idx_logs_username ON activity_logs (username)',
+    'idx_logs_software': 'CREATE INDEX IF NOT EXISTS idx_logs_software ON activity_logs (software)',
+}
+# The write-side setup only has to run once per process
+db_prepared = False
+
+
+def prepare_db():
+    """Switch the database to WAL and create any missing indexes"""
+    global db_prepared
+    if db_prepared:
+        return
+
+    # mode=rw fails on a missing file instead of creating an empty database
+    conn = sqlite3.connect('file:activity_monitor.db?mode=rw', uri=True)
+    try:
+        # WAL is persistent, and lets the UI read while a collector writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        existing = {row[1] for row in conn.execute("PRAGMA index_list(activity_logs)")}
+        missing = [name for name in ACTIVITY_INDEXES if name not in existing]
+        if missing:
+            for name in missing:
+                conn.execute(ACTIVITY_INDEXES[name])
+            # Refresh the planner statistics so the new indexes get picked
+            conn.execute("ANALYZE")
+            conn.commit()
+    finally:
+        conn.close()
+    db_prepared = True
+
+
+def open_db():
+    """Open a read-only connection to activity_monitor.db for the UI's queries"""
+    # Each connection is only used by the thread that opened it, but the
+    # load worker's is closed from the GUI thread once its thread has stopped.
+    # The UI never writes through these, so mode=ro never takes a write lock.
+    conn = sqlite3.connect('file:activity_monitor.db?mode=ro', uri=True, check_same_thread=False)
+    # The larger cache and memory map keep the working set resident between queries
+    conn.executescript('''
+    PRAGMA cache_size=-65536;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    ''')
+    return conn
+
+
+def db_mtimes():
+    """Return the modification times of activity_monitor.db and its WAL, None where missing"""
+    mtimes = []
+    for db_file in ('activity_monitor.db', 'activity_monitor.db-wal'):
+        try:
+            mtimes.append(os.stat(db_file).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+# Zero-padded two-digit strings, indexed instead of formatted per field
+_PAD = [f"{i:02d}" for i in range(100)]
+
+
+@functools.lru_cache(maxsize=4096)
+def _hms(seconds):
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{_PAD[hours] if hours < 100 else hours}:{_PAD[minutes]}:{_PAD[seconds]}"
+
+
+def format_time_seconds_to_hms(seconds):
+    """Convert seconds to HH:MM:SS format"""
+    # Durations repeat a lot (e.g. 0 idle), so formatted values are cached
+    return _hms(int(seconds))
+
+
+def glob_prefix(text):
+    """Return a GLOB pattern matching values that start with text"""
+    # Bracket the GLOB metacharacters so they match literally
+    for char in '[*?':
+        text = text.replace(char, f'[{char}]')
+    return text + '*'
+
+
+def duration_seconds(value):
+    """Return a JSON duration as a non-negative number of seconds"""
+    # Numeric strings are accepted; anything else would only fail once the
+    # model formats the cell
+    if isinstance(value, str):
+        value = float(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"invalid duration {value!r}")
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f"invalid duration {value!r}")
+    return value
+
+
+def read_json_rows(json_path):
+    """Return the activity rows of one JSON file in the model's row shape"""
+    records = []
+    try:
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+
+        # Process each activity record in the JSON file
+        if isinstance(data, dict) and 'activities' in data:
+            username = data.get('username', 'Unknown')
+            for activity in data['activities']:
+                # Extract fields that match our table
+                log_date = activity.get('date', 'Unknown')
+                software = activity.get('software', 'Unknown')
+                start_file = activity.get('start_file', '')
+                end_file = activity.get('end_file', '')
+                start_time = activity.get('start_time', '')
+                active_time = duration_seconds(activity.get('active_time', 0))  # in seconds
+                idle_time = duration_seconds(activity.get('idle_time', 0))  # in seconds
+                total_time = active_time + idle_time  # in seconds
+                end_time = activity.get('end_time', '')
+
+                # Keep the same raw row shape as the database rows
+                records.append((username, log_date, software, start_file, end_file, start_time,
+                                active_time, idle_time, total_time, end_time))
+    except Exception as e:
+        print(f"Error loading JSON file {os.path.basename(json_path)}: {str(e)}")
+    # Rows read before an error are kept, as when they were inserted one by one
+    return records
+
+
+class ActivityModel(QtCore.QAbstractTableModel):
+    """Table model over raw activity rows; cells are only formatted when Qt asks for them"""
+
+    HEADERS = ["User", "Date", "Software", "File", "Start-time", "Active Time", "Idle Time", "Total Time", "End-Time"]
+    # Index into the raw row for each column; the File column joins start_file and end_file
+    SOURCE_FIELDS = (0, 1, 2, None, 5, 6, 7, 8, 9)
+    DURATION_COLUMNS = (5, 6, 7)
+
+    def __init__(self, rows=None, parent=None):
+        super().__init__(parent)
+        # Rows use the activity_logs column order: username, log_date, software,
+        # start_file, end_file, start_time, active_time, idle_time, total_time, end_time
+        self._rows = rows if rows is not None else []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or not index.isValid():
+            return None
+        return self.display_value(self._rows[index.row()], index.column())
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """Append a batch of rows with a single insert notification"""
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def record(self, row):
+        return self._rows[row]
+
+    def display_value(self, record, column):
+        if column == 3:
+            # Format the file display as "start_file ---> end_file"
+            return f"{record[3]} ---> {record[4]}"
+        value = record[self.SOURCE_FIELDS[column]]
+        if column in self.DURATION_COLUMNS:
+            try:
+                return format_time_seconds_to_hms(value)
+            except (TypeError, ValueError):
+                # Show a malformed duration as stored instead of failing every repaint
+                return value
+        return value
+
+    def display_row(self, record):
+        return [self.display_value(record, column) for column in range(len(self.HEADERS))]
+
+
+class LoadWorker(QtCore.QObject):
+    """Runs page queries and JSON loads on a background thread and posts the rows back in chunks"""
+
+    rows_ready = QtCore.Signal(int, object)
+    summary_ready = QtCore.Signal(int, object)
+    finished = QtCore.Signal(int)
+    failed = QtCore.Signal(int, str)
+    # One batch per JSON file, then the end of the load
+    json_rows_ready = QtCore.Signal(int, object)
+    json_finished = QtCore.Signal(int)
+    # Rows per fetchmany call; the first chunk can be painted while the
+    # rest of the page is still being read
+    chunk_size = 100
+
+    def __init__(self):
+        super().__init__()
+        # Opened on the worker thread by the first query
+        self.conn = None
+
+    def run(self, token, query, params, summary_query, summary_params):
+        try:
+            if self.conn is None:
+                self.conn = open_db()
+            cursor = self.conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                self.rows_ready.emit(token, rows)
+
+            # The summary runs after the page so the rows paint first
+            if summary_query:
+                self.summary_ready.emit(token, self.conn.execute(summary_query, summary_params).fetchone())
+        except Exception as e:
+            # Any error has to be reported, or the controls stay disabled
+            self.failed.emit(token, str(e))
+            return
+        self.finished.emit(token)
+
+    def run_json(self, token, json_paths):
+        try:
+            if len(json_paths) < PARALLEL_JSON_MIN_FILES:
+                for json_path in json_paths:
+                    self.json_rows_ready.emit(token, read_json_rows(json_path))
+            else:
+                # Parse the files in worker processes; results come back in
+                # order and each file's rows are posted as soon as it is done
+                workers = min(MAX_JSON_WORKERS, os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    for rows in executor.map(read_json_rows, json_paths, chunksize=4):
+                        self.json_rows_ready.emit(token, rows)
+        except Exception as e:
+            self.failed.emit(token, str(e))
+            return
+        self.json_finished.emit(token)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
 
 
 class ActivityMonitorUI(QtWidgets.QWidget):
+    # Queues a (token, query, params, summary_query, summary_params) page
+    # query onto the load worker's thread; an empty summary_query skips it
+    page_requested = QtCore.Signal(int, str, object, str, object)
+    # Queues a (token, json_paths) load onto the same thread
+    json_requested = QtCore.Signal(int, object)
+
+    # Filter predicates in load_page's bitmask order. The last one seeks past
+    # the previous page with a row-value comparison on the sort key, which the
+    # index can satisfy without OFFSET's skipped-row scan.
+    FILTER_CLAUSES = (
+        "log_date >= ?",
+        "log_date <= ?",
+        "username LIKE ?",
+        "username GLOB ?",
+        "software LIKE ?",
+        "software GLOB ?",
+        "(log_date, start_time, id) < (?, ?, ?)",
+    )
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Activity Monitor")
@@ -36,6 +332,20 @@ class ActivityMonitorUI(QtWidgets.QWidget):
         self.software_completer = QtWidgets.QCompleter()
         self.software.setCompleter(self.software_completer)
 
+        # Anchored matches run as GLOB "name*", which SQLite can answer from
+        # the indexes; unlike LIKE it is case-sensitive
+        self.prefix_match = QtWidgets.QCheckBox("Match from start (case-sensitive)")
+
+        # Editing the text filters re-runs the query once typing pauses,
+        # so a burst of keystrokes costs a single query
+        self.filter_timer = QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self.apply_filters)
+        self.username.textChanged.connect(lambda text: self.filter_timer.start())
+        self.software.textChanged.connect(lambda text: self.filter_timer.start())
+        self.prefix_match.toggled.connect(lambda checked: self.filter_timer.start())
+
         self.apply_button = QtWidgets.QPushButton("Apply Filters")
         self.apply_button.clicked.connect(self.apply_filters)
 
@@ -51,6 +361,7 @@ class ActivityMonitorUI(QtWidgets.QWidget):
         filter_layout.addWidget(self.username, 1, 1, 1, 2)
         filter_layout.addWidget(QtWidgets.QLabel("Software:"), 1, 3)
         filter_layout.addWidget(self.software, 1, 4, 1, 2)
+        filter_layout.addWidget(self.prefix_match, 1, 6)
 
         filter_layout.addWidget(self.apply_button, 2, 0, 1, 3)  # Span across multiple columns
         filter_layout.addWidget(self.clear_button, 2, 3, 1, 3)  # Span across multiple columns
@@ -58,15 +369,22 @@ class ActivityMonitorUI(QtWidgets.QWidget):
         filter_group.setLayout(filter_layout)
         layout.addWidget(filter_group)
 
-        # Table Section
-        self.table = QtWidgets.QTableWidget()
-        self.table.setColumnCount(9)  # Updated to match database columns
-        self.table.setHorizontalHeaderLabels(
-            ["User", "Date", "Software", "File", "Start-time", "Active Time", "Idle Time", "Total Time", "End-Time"])
+        # Table Section; the view only asks the model for the visible cells
+        self.model = ActivityModel(parent=self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        # Fixed row heights spare the view from measuring every row
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
         self.table.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         layout.addWidget(self.table)
 
+        # Busy indicator shown while a page query runs in the background
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setVisible(False)
+        layout.addWidget(self.progress)
+
         # Buttons
         button_layout = QtWidgets.QHBoxLayout()
         self.export_button = QtWidgets.QPushButton("Export to Excel")
@@ -82,107 +400,294 @@ class ActivityMonitorUI(QtWidgets.QWidget):
         self.load_json_button = QtWidgets.QPushButton("Load From JSON")
         self.load_json_button.clicked.connect(self.load_from_json)
 
+        # Page through results instead of loading the whole table at once
+        self.prev_button = QtWidgets.QPushButton("< Previous Page")
+        self.prev_button.clicked.connect(self.prev_page)
+
+        self.next_button = QtWidgets.QPushButton("Next Page >")
+        self.next_button.clicked.connect(self.next_page)
+
         button_layout.addWidget(self.export_button)
         button_layout.addWidget(self.refresh_button)
         button_layout.addWidget(self.view_json_button)
         button_layout.addWidget(self.load_json_button)
+        button_layout.addWidget(self.prev_button)
+        button_layout.addWidget(self.next_button)
 
         layout.addLayout(button_layout)
         self.setLayout(layout)
 
+        # One connection is opened on first use and reused by every query
+        self.conn = None
+        # Query text per filter bitmask, see build_query, build_summary_query
+        # and build_export_query
+        self.stmt_cache = {}
+
+        # Page queries run on a worker thread with its own connection. Each
+        # request gets a token so results of superseded requests are dropped.
+        self.load_token = 0
+        # Rows received for the running request, and whether it returned
+        # more than a page
+        self.page_rows_received = 0
+        self.page_has_more = False
+        # (records, users) matching the current filters, from the first page's query
+        self.filter_summary = None
+        # (mask, params) of the current filters without the page key, which the
+        # export re-runs to cover every page; None while JSON data is shown
+        self.export_filter = None
+        self.load_thread = QtCore.QThread(self)
+        self.load_worker = LoadWorker()
+        self.load_worker.moveToThread(self.load_thread)
+        self.page_requested.connect(self.load_worker.run)
+        self.load_worker.rows_ready.connect(self.on_rows_ready)
+        self.load_worker.summary_ready.connect(self.on_summary_ready)
+        self.load_worker.finished.connect(self.on_load_finished)
+        self.load_worker.failed.connect(self.on_load_failed)
+        self.json_requested.connect(self.load_worker.run_json)
+        self.load_worker.json_rows_ready.connect(self.on_json_rows_ready)
+        self.load_worker.json_finished.connect(self.on_json_finished)
+        self.load_thread.start()
+        # (max(rowid), count(*), file mtimes) the completer lists were built
+        # at; None never matches a real table
+        self.completer_watermark = None
+
+        # Keyset pagination state: cursor_key is the (log_date, start_time, id)
+        # the current page starts after, page_stack holds the keys of earlier
+        # pages and next_key is set while there are more rows to show
+        self.page_size = 500
+        self.cursor_key = None
+        self.page_stack = []
+        self.next_key = None
+
         # Load initial data
         self.load_data()
 
     def connect_to_db(self):
+        if self.conn is not None:
+            return self.conn
+
+        try:
+            prepare_db()
+        except sqlite3.Error as e:
+            # Queries still work without WAL or the indexes, just slower
+            print(f"Could not prepare database: {str(e)}")
+
         try:
-            conn = sqlite3.connect('activity_monitor.db')
-            return conn
+            self.conn = open_db()
         except sqlite3.Error as e:
             QtWidgets.QMessageBox.critical(self, "Database Error", f"Could not connect to database: {str(e)}")
             return None
+        return self.conn
+
+    def close_db(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
 
-    def format_time_seconds_to_hms(self, seconds):
-        """Convert seconds to HH:MM:SS format"""
-        hours, remainder = divmod(seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
+    def closeEvent(self, event):
+        # Let a running query finish before closing its connection
+        self.load_thread.quit()
+        self.load_thread.wait()
+        self.load_worker.close()
+        self.close_db()
+        super().closeEvent(event)
 
     def load_data(self):
-        conn = self.connect_to_db()
-        if not conn:
+        # This load already covers any pending filter edit
+        self.filter_timer.stop()
+
+        # Filters or data changed, so start again from the first page
+        self.cursor_key = None
+        self.page_stack = []
+        self.load_page()
+
+        # Update the completers with current data
+        self.update_completers()
+
+    def next_page(self):
+        if self.next_key is None:
             return
+        self.page_stack.append(self.cursor_key)
+        self.cursor_key = self.next_key
+        self.load_page()
 
-        cursor = conn.cursor()
+    def prev_page(self):
+        if not self.page_stack:
+            return
+        self.cursor_key = self.page_stack.pop()
+        self.load_page()
+
+    def update_page_buttons(self):
+        self.prev_button.setEnabled(bool(self.page_stack))
+        self.next_button.setEnabled(self.next_key is not None)
+
+    def set_loading(self, loading):
+        # Holding the buttons while a query runs also throttles re-queries
+        self.progress.setVisible(loading)
+        for button in (self.apply_button, self.refresh_button, self.load_json_button):
+            button.setEnabled(not loading)
+        if loading:
+            self.prev_button.setEnabled(False)
+            self.next_button.setEnabled(False)
+        else:
+            self.update_page_buttons()
+
+    def build_where(self, mask):
+        # Join the selected clauses once instead of appending them one by one
+        clauses = [clause for bit, clause in enumerate(self.FILTER_CLAUSES) if mask & (1 << bit)]
+        return "WHERE " + " AND ".join(clauses) if clauses else ""
 
-        # Build query based on current filter settings
-        query = '''
+    def build_query(self, mask):
+        # id is selected last so it can break ties in the page key without
+        # shifting the model columns
+        return f'''
         SELECT username, log_date, software, start_file, end_file, start_time, 
+               active_time, idle_time, total_time, end_time, id
+        FROM activity_logs
+        {self.build_where(mask)}
+        ORDER BY log_date DESC, start_time DESC, id DESC LIMIT ?
+        '''
+
+    def build_export_query(self, mask):
+        # The page query without the keyset seek and LIMIT
+        return f'''
+        SELECT username, log_date, software, start_file, end_file, start_time,
                active_time, idle_time, total_time, end_time
         FROM activity_logs
-        WHERE 1=1
+        {self.build_where(mask)}
+        ORDER BY log_date DESC, start_time DESC, id DESC
         '''
 
+    def build_summary_query(self, mask):
+        # One pass over the filtered range gives every figure in the title
+        return f'''
+        SELECT COUNT(*), COUNT(DISTINCT username)
+        FROM activity_logs
+        {self.build_where(mask)}
+        '''
+
+    def load_page(self):
+        # Opening the GUI connection also prepares the database before the
+        # worker's first query
+        if not self.connect_to_db():
+            return
+
+        # Collect the active filters as a bitmask over FILTER_CLAUSES plus
+        # their parameters in the same order
+        mask = 0
         params = []
 
         # Add filter conditions if they are set
         if self.start_date.date() != QtCore.QDate(2000, 1, 1):
-            query += " AND log_date >= ?"
+            mask |= 1
             params.append(self.start_date.date().toString("yyyy-MM-dd"))
 
         if self.end_date.date() != QtCore.QDate(2099, 12, 31):
-            query += " AND log_date <= ?"
+            mask |= 2
             params.append(self.end_date.date().toString("yyyy-MM-dd"))
 
+        # A leading-% LIKE can never use an index, while a GLOB prefix on
+        # the binary-collated columns becomes an index range
+        prefix = self.prefix_match.isChecked()
+
         if self.username.text():
-            query += " AND username LIKE ?"
-            params.append(f"%{self.username.text()}%")
+            if prefix:
+                mask |= 8
+                params.append(glob_prefix(self.username.text()))
+            else:
+                mask |= 4
+                params.append(f"%{self.username.text()}%")
 
         if self.software.text():
-            query += " AND software LIKE ?"
-            params.append(f"%{self.software.text()}%")
+            if prefix:
+                mask |= 32
+                params.append(glob_prefix(self.software.text()))
+            else:
+                mask |= 16
+                params.append(f"%{self.software.text()}%")
+
+        # The filters are the same on every page, so the totals are only
+        # counted along with the first one
+        summary_query = ""
+        summary_params = []
+        if self.cursor_key is None:
+            summary_query = self.stmt_cache.get(('summary', mask))
+            if summary_query is None:
+                summary_query = self.stmt_cache[('summary', mask)] = self.build_summary_query(mask)
+            summary_params = list(params)
+            self.filter_summary = None
+        self.export_filter = (mask, list(params))
+
+        if self.cursor_key is not None:
+            mask |= 64
+            params.extend(self.cursor_key)
+
+        # Each filter shape always produces the same SQL text, which lets
+        # sqlite3's statement cache reuse the compiled statement
+        query = self.stmt_cache.get(mask)
+        if query is None:
+            query = self.stmt_cache[mask] = self.build_query(mask)
+
+        # One extra row tells whether there is a next page
+        params.append(self.page_size + 1)
+
+        self.load_token += 1
+        self.page_rows_received = 0
+        self.page_has_more = False
+        self.set_loading(True)
+        self.page_requested.emit(self.load_token, query, params, summary_query, summary_params)
+
+    def on_rows_ready(self, token, records):
+        if token != self.load_token:
+            return
 
-        query += " ORDER BY log_date DESC, start_time DESC"
+        # The extra row past the page only signals that a next page exists
+        room = self.page_size - self.page_rows_received
+        if len(records) > room:
+            records = records[:room]
+            self.page_has_more = True
 
-        try:
-            cursor.execute(query, params)
-            records = cursor.fetchall()
-
-            # Clear existing table data
-            self.table.setRowCount(0)
-
-            # Populate table with data
-            for row_idx, record in enumerate(records):
-                self.table.insertRow(row_idx)
-
-                # Format times to HH:MM:SS format
-                active_time_formatted = self.format_time_seconds_to_hms(record[6])
-                idle_time_formatted = self.format_time_seconds_to_hms(record[7])
-                total_time_formatted = self.format_time_seconds_to_hms(record[8])
-
-                # Format the file display as "start_file ---> end_file"
-                file_display = f"{record[3]} ---> {record[4]}"
-
-                # Set data in table cells
-                self.table.setItem(row_idx, 0, QtWidgets.QTableWidgetItem(record[0]))  # username
-                self.table.setItem(row_idx, 1, QtWidgets.QTableWidgetItem(record[1]))  # date
-                self.table.setItem(row_idx, 2, QtWidgets.QTableWidgetItem(record[2]))  # software
-                self.table.setItem(row_idx, 3, QtWidgets.QTableWidgetItem(file_display))  # formatted file path
-                self.table.setItem(row_idx, 4, QtWidgets.QTableWidgetItem(record[5]))  # start time
-                self.table.setItem(row_idx, 5, QtWidgets.QTableWidgetItem(active_time_formatted))  # active time
-                self.table.setItem(row_idx, 6, QtWidgets.QTableWidgetItem(idle_time_formatted))  # idle time
-                self.table.setItem(row_idx, 7, QtWidgets.QTableWidgetItem(total_time_formatted))  # total time
-                self.table.setItem(row_idx, 8, QtWidgets.QTableWidgetItem(record[9]))  # end time
-
-            # Update status message with count of records
-            self.setWindowTitle(f"Activity Monitor - {len(records)} records found")
+        # Hand the raw rows to the model; cells are formatted on demand. The
+        # first chunk replaces the previous page, later ones are appended.
+        if self.page_rows_received == 0:
+            self.model.set_rows(list(records))
+        else:
+            self.model.append_rows(records)
+        self.page_rows_received += len(records)
 
-        except sqlite3.Error as e:
-            QtWidgets.QMessageBox.critical(self, "Query Error", f"Error loading data: {str(e)}")
-        finally:
-            conn.close()
+    def on_summary_ready(self, token, summary):
+        if token == self.load_token:
+            self.filter_summary = summary
 
-        # Update the completers with current data
-        self.update_completers()
+    def on_load_finished(self, token):
+        if token != self.load_token:
+            return
+
+        if self.page_rows_received == 0:
+            self.model.set_rows([])
+
+        if self.page_has_more:
+            last = self.model.record(self.model.rowCount() - 1)
+            self.next_key = (last[1], last[5], last[10])
+        else:
+            self.next_key = None
+
+        # Update status message with count of records
+        page = len(self.page_stack) + 1
+        if self.filter_summary is not None:
+            records, users = self.filter_summary
+            self.setWindowTitle(f"Activity Monitor - {records} records found for {users} users "
+                                f"(page {page}, {self.page_rows_received} shown)")
+        else:
+            self.setWindowTitle(f"Activity Monitor - {self.page_rows_received} records found (page {page})")
+        self.set_loading(False)
+
+    def on_load_failed(self, token, message):
+        if token != self.load_token:
+            return
+        self.next_key = None
+        self.set_loading(False)
+        QtWidgets.QMessageBox.critical(self, "Query Error", f"Error loading data: {message}")
 
     def update_completers(self):
         conn = self.connect_to_db()
@@ -191,6 +696,17 @@ class ActivityMonitorUI(QtWidgets.QWidget):
 
         cursor = conn.cursor()
 
+        # Skip the DISTINCT scans while the table looks unchanged. max(rowid)
+        # alone is not enough: regenerating the sample database restarts
+        # AUTOINCREMENT, so a rebuilt table can end on the same rowid. The
+        # row count and the modification times of the database and its WAL
+        # catch deletes and rebuilds.
+        cursor.execute("SELECT max(rowid), count(*) FROM activity_logs")
+        watermark = tuple(cursor.fetchone()) + db_mtimes()
+        if watermark == self.completer_watermark:
+            return
+        self.completer_watermark = watermark
+
         # Get unique usernames
         cursor.execute("SELECT DISTINCT username FROM activity_logs")
         usernames = [row[0] for row in cursor.fetchall()]
@@ -203,8 +719,6 @@ class ActivityMonitorUI(QtWidgets.QWidget):
         software_model = QtCore.QStringListModel(software_names)
         self.software_completer.setModel(software_model)
 
-        conn.close()
-
     def load_from_json(self):
         """Load activity data from JSON files instead of database"""
         # Ask user to select a directory where JSON files are stored
@@ -222,55 +736,35 @@ class ActivityMonitorUI(QtWidgets.QWidget):
             QtWidgets.QMessageBox.warning(self, "No JSON Files", f"No JSON files found in {json_dir}")
             return
 
-        # Clear existing table data
-        self.table.setRowCount(0)
+        # Each file is parsed on the load worker's thread and its rows are
+        # added to the model as they arrive
+        json_paths = [os.path.join(json_dir, json_file) for json_file in json_files]
 
-        # Load data from each JSON file
-        row_idx = 0
-        for json_file in json_files:
-            try:
-                with open(os.path.join(json_dir, json_file), 'r') as f:
-                    data = json.load(f)
-
-                    # Process each activity record in the JSON file
-                    if isinstance(data, dict) and 'activities' in data:
-                        activities = data['activities']
-                        for activity in activities:
-                            # Extract fields that match our table
-                            username = data.get('username', 'Unknown')
-                            log_date = activity.get('date', 'Unknown')
-                            software = activity.get('software', 'Unknown')
-                            start_file = activity.get('start_file', '')
-                            end_file = activity.get('end_file', '')
-                            start_time = activity.get('start_time', '')
-                            active_time = activity.get('active_time', 0)  # in seconds
-                            idle_time = activity.get('idle_time', 0)  # in seconds
-                            total_time = active_time + idle_time  # in seconds
-                            end_time = activity.get('end_time', '')
-
-                            # Format times
-                            active_time_formatted = self.format_time_seconds_to_hms(active_time)
-                            idle_time_formatted = self.format_time_seconds_to_hms(idle_time)
-                            total_time_formatted = self.format_time_seconds_to_hms(total_time)
-
-                            # Format file display
-                            file_display = f"{start_file} ---> {end_file}"
-
-                            # Add to table
-                            self.table.insertRow(row_idx)
-                            self.table.setItem(row_idx, 0, QtWidgets.QTableWidgetItem(username))
-                            self.table.setItem(row_idx, 1, QtWidgets.QTableWidgetItem(log_date))
-                            self.table.setItem(row_idx, 2, QtWidgets.QTableWidgetItem(software))
-                            self.table.setItem(row_idx, 3, QtWidgets.QTableWidgetItem(file_display))
-                            self.table.setItem(row_idx, 4, QtWidgets.QTableWidgetItem(start_time))
-                            self.table.setItem(row_idx, 5, QtWidgets.QTableWidgetItem(active_time_formatted))
-                            self.table.setItem(row_idx, 6, QtWidgets.QTableWidgetItem(idle_time_formatted))
-                            self.table.setItem(row_idx, 7, QtWidgets.QTableWidgetItem(total_time_formatted))
-                            self.table.setItem(row_idx, 8, QtWidgets.QTableWidgetItem(end_time))
-
-                            row_idx += 1
-            except Exception as e:
-                print(f"Error loading JSON file {json_file}: {str(e)}")
+        # Drop the result of any page query still running; its rows would
+        # otherwise land in the middle of the JSON data
+        self.load_token += 1
+        self.model.set_rows([])
+
+        # JSON data is shown in one go, so there are no pages to move between
+        # and the export writes the model's rows
+        self.export_filter = None
+        self.cursor_key = None
+        self.page_stack = []
+        self.next_key = None
+
+        self.set_loading(True)
+        self.json_requested.emit(self.load_token, json_paths)
+
+    def on_json_rows_ready(self, token, records):
+        if token == self.load_token:
+            self.model.append_rows(records)
+
+    def on_json_finished(self, token):
+        if token != self.load_token:
+            return
+        self.set_loading(False)
+
+        row_idx = self.model.rowCount()
 
         # Update status message with count of records
         self.setWindowTitle(f"Activity Monitor - {row_idx} records loaded from JSON")
@@ -295,28 +789,19 @@ class ActivityMonitorUI(QtWidgets.QWidget):
         self.end_date.setDate(QtCore.QDate.currentDate())
         self.username.clear()
         self.software.clear()
+        self.prefix_match.setChecked(False)
         self.load_data()
 
     def export_to_excel(self):
         try:
-            import pandas as pd
+            try:
+                import xlsxwriter
+            except ImportError:
+                # Fall back to pandas and its default Excel engine
+                xlsxwriter = None
+                import pandas as pd
             from PySide2.QtWidgets import QFileDialog
 
-            # Get data from the table
-            data = []
-            for row in range(self.table.rowCount()):
-                row_data = []
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                data.append(row_data)
-
-            # Create DataFrame
-            df = pd.DataFrame(data, columns=[
-                "User", "Date", "Software", "File", "Start-time",
-                "Active Time", "Idle Time", "Total Time", "End-Time"
-            ])
-
             # Ask user where to save the file
             file_path, _ = QFileDialog.getSaveFileName(
                 self, "Save Excel File", "", "Excel Files (*.xlsx)"
@@ -325,31 +810,63 @@ class ActivityMonitorUI(QtWidgets.QWidget):
             if file_path:
                 if not file_path.endswith('.xlsx'):
                     file_path += '.xlsx'
-                df.to_excel(file_path, index=False)
+
+                if self.export_filter is not None:
+                    # The model only holds the current page, so re-run the
+                    # filters without the page key to export every matching row
+                    conn = self.connect_to_db()
+                    if not conn:
+                        return
+                    mask, params = self.export_filter
+                    query = self.stmt_cache.get(('export', mask))
+                    if query is None:
+                        query = self.stmt_cache[('export', mask)] = self.build_export_query(mask)
+                    records = conn.execute(query, params)
+                else:
+                    # JSON data lives only in the model
+                    records = (self.model.record(row) for row in range(self.model.rowCount()))
+
+                # Formatted the same way as the table
+                rows = (self.model.display_row(record) for record in records)
+
+                if xlsxwriter is not None:
+                    # constant_memory flushes each row to disk as it is written
+                    # instead of holding the whole worksheet in memory
+                    workbook = xlsxwriter.Workbook(file_path, {'constant_memory': True})
+                    worksheet = workbook.add_worksheet()
+                    worksheet.write_row(0, 0, ActivityModel.HEADERS)
+                    for row_idx, row in enumerate(rows, 1):
+                        worksheet.write_row(row_idx, 0, row)
+                    workbook.close()
+                else:
+                    df = pd.DataFrame(list(rows), columns=ActivityModel.HEADERS)
+                    df.to_excel(file_path, index=False)
+
                 QtWidgets.QMessageBox.information(
                     self, "Export Successful", f"Data exported to {file_path}"
                 )
         except ImportError:
             QtWidgets.QMessageBox.warning(
                 self, "Export Failed",
-                "Please install pandas to use the Excel export feature:\npip install pandas openpyxl"
+                "Please install xlsxwriter to use the Excel export feature:\npip install xlsxwriter"
             )
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Export Error", f"Error exporting data: {str(e)}")
 
     def view_user_json(self):
         # Get selected row
-        selected_rows = self.table.selectedItems()
-        if not selected_rows:
+        selected_indexes = self.table.selectionModel().selectedIndexes()
+        if not selected_indexes:
             QtWidgets.QMessageBox.information(self, "Selection Required", "Please select a row to view its JSON data")
             return
 
-        # Find the row of the first selected item
-        row = selected_rows[0].row()
+        # Find the row of the first selected cell
+        row = selected_indexes[0].row()
 
         # Get username and date from the selected row
-        username = self.table.item(row, 0).text()
-        date = self.table.item(row, 1).text()
+        record = self.model.record(row)
+        username = record[0]
+        date = record[1]
 
         # Check if JSON file exists
         json_file_path = f"user_activity_logs/{username}_{date}.json"
@@ -358,9 +875,14 @@ class ActivityMonitorUI(QtWidgets.QWidget):
             return
 
         try:
-            # Read JSON file
-            with open(json_file_path, 'r') as f:
-                user_data = json.load(f)
+            # Read JSON file; large files are already indented by the generator,
+            # so only smaller ones are parsed and re-formatted
+            with open(json_file_path, 'rb') as f:
+                raw = f.read()
+            if len(raw) > RAW_JSON_DISPLAY_BYTES:
+                json_text = raw.decode('utf-8')
+            else:
+                json_text = pretty_json(raw)
 
             # Create a simple dialog to display JSON data
             dialog = QtWidgets.QDialog(self)
@@ -369,11 +891,12 @@ class ActivityMonitorUI(QtWidgets.QWidget):
 
             layout = QtWidgets.QVBoxLayout()
 
-            # Create a text area for JSON display
-            text_area = QtWidgets.QTextEdit()
+            # Create a text area for JSON display; QPlainTextEdit lays out
+            # blocks lazily instead of building a rich-text document
+            text_area = QtWidgets.QPlainTextEdit()
             text_area.setReadOnly(True)
             text_area.setFont(QtGui.QFont("Courier New", 10))
-            text_area.setText(json.dumps(user_data, indent=4))
+            text_area.setPlainText(json_text)
 
             layout.addWidget(text_area)
 